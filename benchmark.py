@@ -0,0 +1,195 @@
+"""Нагрузочный тест бота без Telegram.
+
+Обработчики из beerbot вызываются с синтетическими апдейтами, ответы reply_text
+складываются в память. База генерируется заново в указанном (или временном) файле.
+
+Пример:
+    python benchmark.py --users 200 --rows-per-user 500 --iterations 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Бенчмарк обработчиков beerbot")
+    parser.add_argument("--db", help="файл базы (по умолчанию временный)")
+    parser.add_argument("--users", type=int, default=100, help="число пользователей")
+    parser.add_argument("--rows-per-user", type=int, default=200, help="записей на пользователя")
+    parser.add_argument("--activities", help="активности через запятую (по умолчанию все)")
+    parser.add_argument("--days", type=int, default=90, help="глубина истории в днях")
+    parser.add_argument("--iterations", type=int, default=100, help="вызовов каждой команды")
+    parser.add_argument("--concurrency", type=int, default=8, help="одновременных апдейтов в тесте пропускной способности")
+    parser.add_argument("--no-cache", action="store_true", help="отключить кэш ответов /stats и /total")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# Окружение нужно выставить до импорта beerbot: бот создается при импорте
+if args.db is None:
+    args.db = os.path.join(tempfile.mkdtemp(prefix="beerbot-bench-"), "bench.db")
+elif os.path.exists(args.db):
+    sys.exit(f"Файл {args.db} уже существует, бенчмарк создает базу с нуля")
+os.environ["DATABASE_PATH"] = args.db
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+# Синтетическая нагрузка упирается в лимит частоты записей одного пользователя
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "0")
+if args.no_cache:
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+import beerbot  # noqa: E402
+
+
+CHAT_ID = -1000
+
+
+class FakeMessage:
+    def __init__(self, text: str, chat_id: int):
+        self.text = text
+        self.chat_id = chat_id
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.username = f"user{user_id}"
+
+
+class FakeChat:
+    def __init__(self, chat_id: int):
+        self.id = chat_id
+        self.type = "group"
+
+
+class FakeUpdate:
+    def __init__(self, user_id: int, text: str, chat_id: int = CHAT_ID):
+        self.message = FakeMessage(text, chat_id)
+        self.effective_message = self.message
+        self.effective_user = FakeUser(user_id)
+        self.effective_chat = FakeChat(chat_id)
+
+
+class FakeContext:
+    def __init__(self, command_args):
+        self.args = command_args
+
+
+def generate_database(activities, rng):
+    """Заполнение базы историей через штатный путь записи"""
+    now = int(time.time())
+    batch = []
+    for user_id in range(1, args.users + 1):
+        for _ in range(args.rows_per_user):
+            timestamp = now - rng.randrange(args.days * 86400)
+            batch.append((rng.choice(activities), user_id, f"user{user_id}", rng.randint(1, 100), timestamp, CHAT_ID))
+            if len(batch) >= 10000:
+                beerbot.bot.write_activities(batch)
+                batch = []
+    if batch:
+        beerbot.bot.write_activities(batch)
+    beerbot.bot.response_cache.invalidate()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def measure(name, make_call):
+    """Последовательные вызовы команды: задержки и число запросов на апдейт"""
+    latencies = []
+    queries_before = beerbot.metrics.query_count()
+    for i in range(args.iterations):
+        handler, update, context = make_call(i)
+        started = time.perf_counter()
+        await handler(update, context)
+        latencies.append((time.perf_counter() - started) * 1000)
+    # Отложенная запись тоже считается частью стоимости команды
+    beerbot.bot.flush()
+    queries = (beerbot.metrics.query_count() - queries_before) / args.iterations
+    return {
+        'name': name,
+        'p50': statistics.median(latencies),
+        'p99': percentile(latencies, 99),
+        'queries': queries,
+    }
+
+
+async def measure_throughput(make_calls):
+    """Смешанная нагрузка с ограниченным числом одновременных апдейтов"""
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run(call):
+        handler, update, context = call
+        async with semaphore:
+            await handler(update, context)
+
+    calls = make_calls()
+    started = time.perf_counter()
+    await asyncio.gather(*(run(call) for call in calls))
+    beerbot.bot.flush()
+    return len(calls) / (time.perf_counter() - started)
+
+
+async def main():
+    rng = random.Random(args.seed)
+    activities = args.activities.split(",") if args.activities else list(beerbot.ACTIVITIES)
+    unknown = [key for key in activities if key not in beerbot.ACTIVITIES]
+    if unknown:
+        sys.exit(f"Неизвестные активности: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    generate_database(activities, rng)
+    print(f"База {args.db}: {args.users} пользователей × {args.rows_per_user} записей "
+          f"за {time.perf_counter() - started:.1f} с")
+
+    handlers = {key: beerbot.create_activity_handler(key) for key in activities}
+
+    def random_user():
+        return rng.randint(1, args.users)
+
+    def activity_call(i):
+        key = activities[i % len(activities)]
+        count = rng.randint(1, 100)
+        return handlers[key], FakeUpdate(random_user(), f"/{key} {count}"), FakeContext([str(count)])
+
+    def stats_call(i):
+        return beerbot.stats_command, FakeUpdate(random_user(), "/stats"), FakeContext([])
+
+    def total_call(i):
+        return beerbot.total_command, FakeUpdate(random_user(), "/total"), FakeContext([])
+
+    results = [
+        await measure("/<activity>", activity_call),
+        await measure("/stats", stats_call),
+        await measure("/total", total_call),
+    ]
+
+    def mixed_calls():
+        makers = [activity_call] * 8 + [stats_call] * 3 + [total_call]
+        return [rng.choice(makers)(i) for i in range(args.iterations * 3)]
+
+    throughput = await measure_throughput(mixed_calls)
+
+    print(f"\n{'команда':<14}{'p50, мс':>10}{'p99, мс':>10}{'SQL/апдейт':>12}")
+    for result in results:
+        print(f"{result['name']:<14}{result['p50']:>10.2f}{result['p99']:>10.2f}{result['queries']:>12.1f}")
+    print(f"\nСмешанная нагрузка (concurrency={args.concurrency}): {throughput:.0f} апдейтов/с")
+
+    beerbot.db.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# beerbot читает окружение и открывает базу при импорте
+os.environ.setdefault("BOT_TOKEN", "test-token")
+os.environ["DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="beerbot-tests-"), "import.db")
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ.pop("WEBHOOK_URL", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+"""Сжатие журнала и повторный импорт его выгрузки"""
+import io
+import time
+
+import beerbot
+
+
+def open_bot(monkeypatch, path):
+    monkeypatch.setenv("DATABASE_PATH", str(path))
+    return beerbot.FitnessBot('sqlite')
+
+
+def totals(bot):
+    return {(user['user_id'], activity): stats['total']
+            for user in bot.get_all_users_stats() for activity, stats in user['stats'].items() if stats['total']}
+
+
+def test_compacted_export_imports_back(tmp_path, monkeypatch):
+    source = open_bot(monkeypatch, tmp_path / "source.db")
+    day = int(time.time()) // 86400 * 86400 - 200 * 86400 + 12 * 3600
+    lines = ["user_id,username,chat_id,activity,count,timestamp"]
+    for i in range(30):
+        lines.append(f"1,alice,-10,pushup,9000,{day + i * 60}")
+        lines.append(f"2,bob,-10,pushup,100,{day + i * 60}")
+        lines.append(f"2,bob,,beer,500,{day + 86400 + i * 60}")
+    assert source.import_activities(lines)['imported'] == 90
+
+    expected = totals(source)
+    result = source.compact_activity_log(beerbot.COMPACT_MIN_DAYS)
+    # 270000 = 27 строк по 10000; 3000 и 15000 - по одной и двум строкам
+    assert result['removed'] == 90 - (27 + 1 + 2)
+    counts = [count for count, in source.db.reader().execute("SELECT count FROM activity_log")]
+    assert len(counts) == 30 and max(counts) <= beerbot.MAX_ACTIVITY_COUNT
+    assert totals(source) == expected
+
+    exported = io.BytesIO()
+    source.export_activities(exported)
+    source.close()
+
+    restored = open_bot(monkeypatch, tmp_path / "restored.db")
+    exported.seek(0)
+    report = restored.import_activities(beerbot.open_import_text(exported))
+    assert (report['imported'], report['skipped']) == (30, 0)
+    assert totals(restored) == expected
+    restored.close()
@@ -0,0 +1,31 @@
+"""Метрики в формате Prometheus"""
+import beerbot
+
+
+def metric_name(line: str):
+    name = line.split('{')[0].split(' ')[0]
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def test_metric_families_are_contiguous():
+    metrics = beerbot.Metrics()
+    metrics.record_query("SELECT 1", 0.001)
+    metrics.record_query("SELECT 2", 0.002)
+    metrics.observe('handler', 'stats', 0.01)
+    metrics.observe('handler', 'total', 0.02)
+
+    families = []
+    declared = None
+    for line in metrics.render_prometheus().splitlines():
+        if line.startswith('# TYPE '):
+            declared = line.split()[2]
+            continue
+        name = metric_name(line)
+        assert name == declared, line
+        if not families or families[-1] != name:
+            families.append(name)
+    assert len(families) == len(set(families))
+    assert {'beerbot_queries_total', 'beerbot_query_seconds_total'} <= set(families)
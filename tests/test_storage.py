@@ -0,0 +1,183 @@
+"""Контракт Storage: одни и те же проверки для SQLiteStorage и PostgresStorage.
+
+PostgreSQL проверяется, только если задан TEST_DATABASE_URL (таблицы в этой базе очищаются).
+"""
+import asyncio
+import os
+
+import pytest
+
+import beerbot
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+POSTGRES_TABLES = "activity_log, activity_totals, users, chat_members, chat_settings, achievements"
+
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def open_storage(request, tmp_path, monkeypatch):
+    """Фабрика хранилищ одного бэкенда над общей базой: каждое хранилище - отдельный воркер"""
+    backend = request.param
+    if backend == 'postgres':
+        if not TEST_DATABASE_URL:
+            pytest.skip("TEST_DATABASE_URL не задан")
+        pytest.importorskip("asyncpg")
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "fitness_bot.db"))
+
+    async def factory():
+        if backend == 'sqlite':
+            storage = beerbot.SQLiteStorage(beerbot.FitnessBot('sqlite'))
+            await storage.start()
+        else:
+            storage = beerbot.PostgresStorage(beerbot.FitnessBot('postgres'), TEST_DATABASE_URL)
+            await storage.start()
+            if not factory.opened:
+                async with storage.pool.acquire() as conn:
+                    await conn.execute(f"TRUNCATE {POSTGRES_TABLES}")
+        factory.opened.append(storage)
+        return storage
+
+    factory.opened = []
+    return factory
+
+
+def run(open_storage, scenario, workers: int = 1):
+    """Запуск сценария с workers хранилищами и их закрытие"""
+    async def main():
+        storages = [await open_storage() for _ in range(workers)]
+        try:
+            return await scenario(*storages)
+        finally:
+            for storage in storages:
+                await storage.close()
+
+    return asyncio.run(main())
+
+
+def test_storages_implement_interface():
+    with pytest.raises(TypeError):
+        beerbot.Storage()
+    assert issubclass(beerbot.SQLiteStorage, beerbot.MaintenanceStorage)
+    assert not issubclass(beerbot.PostgresStorage, beerbot.MaintenanceStorage)
+
+
+def test_add_activity_updates_stats(open_storage):
+    async def scenario(db):
+        await db.add_activity('pushup', 1, 'alice', 30, -10)
+        await db.add_activity('pushup', 1, 'alice', 20, -10)
+        await db.add_activity('pullup', 1, 'alice', 15, -10)
+        await db.add_activity('pushup', 2, 'bob', 5, -10)
+        return (await db.get_user_stats(1), await db.get_activity_stats('pushup', 2),
+                await db.get_activity_stats('unknown', 1), await db.get_all_users_stats())
+
+    user_stats, bob_pushups, unknown, all_users = run(open_storage, scenario)
+    assert user_stats['pushup'] == {'today': 50, 'week': 50, 'month': 50, 'total': 50}
+    assert user_stats['pullup']['total'] == 15
+    assert user_stats['beer']['total'] == 0
+    assert bob_pushups == {'today': 5, 'week': 5, 'month': 5, 'total': 5}
+    assert unknown == beerbot.empty_activity_stats()
+    assert {user['user_id']: user['stats']['pushup']['total'] for user in all_users} == {1: 50, 2: 5}
+
+
+def test_add_unknown_activity_is_rejected(open_storage):
+    async def scenario(db):
+        with pytest.raises(ValueError):
+            await db.add_activity('unknown', 1, 'alice', 10)
+        return await db.get_all_users_stats()
+
+    assert run(open_storage, scenario) == []
+
+
+def test_username_kept_when_missing(open_storage):
+    async def scenario(db):
+        await db.add_activity('pushup', 1, 'alice', 10)
+        await db.add_activity('pushup', 1, None, 10)
+        return await db.get_all_users_stats()
+
+    users = run(open_storage, scenario)
+    assert [(user['username'], user['stats']['pushup']['total']) for user in users] == [('alice', 20)]
+
+
+def test_achievements_granted_once_across_workers(open_storage):
+    async def scenario(*workers):
+        await workers[0].add_activity('pushup', 1, 'alice', 300)
+        # Оба воркера видят одну сумму одновременно и пытаются выдать те же рубежи
+        results = []
+        for _ in range(3):
+            results += await asyncio.gather(*(
+                worker.check_and_add_achievement(1, 'alice', 'pushup', 300) for worker in workers
+            ))
+        await workers[1].add_activity('pushup', 1, 'alice', 300)
+        results += await asyncio.gather(*(
+            worker.check_and_add_achievement(1, 'alice', 'pushup', 600) for worker in workers
+        ))
+        return results, await workers[1].check_and_add_achievement(1, 'alice', 'unknown', 600)
+
+    results, unknown = run(open_storage, scenario, workers=2)
+    granted = sorted(milestone for milestones in results for milestone in milestones)
+    assert granted == [100, 250, 500]
+    assert unknown == []
+
+
+def test_leaderboard_paging(open_storage):
+    page_size = beerbot.LEADERBOARD_PAGE_SIZE
+
+    async def scenario(db):
+        for user_id in range(1, 21):
+            await db.add_activity('pushup', user_id, f"user{user_id}", user_id * 10, -20)
+        # Участник другого чата не попадает в рейтинг чата
+        await db.add_activity('pushup', 99, 'stranger', 1000, -30)
+        pages = [await db.get_leaderboard_page(-20, 'pushup', 'total', page) for page in range(3)]
+        clamped = await db.get_leaderboard_page(-20, 'pushup', 'total', 10)
+        overall = await db.get_leaderboard_page(None, 'pushup', 'total', 0)
+        return pages, clamped, overall
+
+    pages, clamped, overall = run(open_storage, scenario)
+    total_pages = -(-20 // page_size)
+    assert len(pages) >= total_pages
+    ranking = []
+    for number, page in enumerate(pages[:total_pages]):
+        assert (page['page'], page['pages'], page['total_users']) == (number, total_pages, 20)
+        assert page['offset'] == number * page_size
+        ranking += [(user['user_id'], user['stats']['pushup']['total']) for user in page['users']]
+    assert ranking == [(user_id, user_id * 10) for user_id in range(20, 0, -1)]
+    assert clamped['page'] == total_pages - 1
+    assert clamped['users'] == pages[total_pages - 1]['users']
+    assert overall['total_users'] == 21
+    assert overall['users'][0]['username'] == 'stranger'
+
+
+def test_chat_timezone_round_trip(open_storage):
+    async def scenario(writer, reader):
+        default = await reader.get_chat_timezone(-10)
+        await writer.set_chat_timezone(-10, 'Asia/Tokyo')
+        with pytest.raises(ValueError):
+            await writer.set_chat_timezone(-10, 'Not/AZone')
+        return default, await writer.get_chat_timezone(-10), await writer.get_chat_timezone(-11)
+
+    default, stored, other = run(open_storage, scenario, workers=2)
+    assert default.key == beerbot.DEFAULT_TIMEZONE
+    assert stored.key == 'Asia/Tokyo'
+    assert other.key == beerbot.DEFAULT_TIMEZONE
+
+
+def test_leaderboard_includes_buffered_writes(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "fitness_bot.db"))
+    monkeypatch.setattr(beerbot, "WRITE_BEHIND", True)
+    bot = beerbot.FitnessBot('sqlite')
+    # Фоновый сброс не успеет сработать: записи остаются только в буфере
+    bot.write_buffer.close()
+    bot.write_buffer = beerbot.WriteBehindBuffer(bot.write_activities, interval_ms=60_000)
+
+    async def scenario(db):
+        await db.add_activity('pushup', 1, 'alice', 10, -10)
+        bot.flush()
+        await db.add_activity('pushup', 2, 'bob', 500, -10)
+        return await db.get_leaderboard_page(-10, 'pushup', 'total', 0)
+
+    async def open_storage():
+        return beerbot.SQLiteStorage(bot)
+
+    page = run(open_storage, scenario)
+    assert page['total_users'] == 2
+    assert [(user['username'], user['stats']['pushup']['total']) for user in page['users']] == \
+        [('bob', 500), ('alice', 10)]